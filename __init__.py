@@ -12,10 +12,15 @@ import bpy
 import os
 import threading
 import tempfile
-import urllib.request
+import urllib.parse
+import http.client
 import subprocess
 import hashlib
+import struct
+import mmap
 import json
+import re
+import functools
 import time
 
 # ------------------------------------------------------
@@ -24,35 +29,76 @@ import time
 
 ADDON_DIR = os.path.dirname(os.path.realpath(__file__))
 SEVEN_ZIP_PATH = os.path.join(ADDON_DIR, r"modules\7-Zip\7z.exe")
+ARCHIVE_CACHE_DIR = os.path.join(tempfile.gettempdir(), "quick_save_on_discord")
+ARCHIVE_CACHE_MAX_AGE = 24 * 60 * 60  # 24 h
+ARCHIVE_CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024  # 2 GB
 
 PARTIAL_HASH_CHUNK = 2 * 1024 * 1024  # 2 MB
+UPLOAD_CHUNK = 1024 * 1024  # 1 MB
+
+# Recompress at Archival only when within 10% of the upload limit
+RECOMPRESS_MARGIN = 1.10
+
+# 7z -mx level per preset
+COMPRESSION_PRESETS = {
+    "FAST": 3,
+    "BALANCED": 5,
+    "ARCHIVAL": 9,
+}
 
 # ------------------------------------------------------
 # HASH (FAST + SAFE)
 # ------------------------------------------------------
 
-def compute_partial_hash(path):
-    size = os.path.getsize(path)
-    h = hashlib.sha1()
-
-    with open(path, "rb") as f:
-        h.update(f.read(PARTIAL_HASH_CHUNK))
-        if size > PARTIAL_HASH_CHUNK:
-            f.seek(max(size - PARTIAL_HASH_CHUNK, 0))
-            h.update(f.read(PARTIAL_HASH_CHUNK))
+def compute_partial_hash(path, size=None):
+    if size is None:
+        size = os.path.getsize(path)
+    h = hashlib.blake2b(digest_size=16)
+
+    if size:
+        # Hash straight from the page cache, no intermediate bytes copies
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                h.update(view[:PARTIAL_HASH_CHUNK])
+                if size > PARTIAL_HASH_CHUNK:
+                    h.update(view[max(size - PARTIAL_HASH_CHUNK, 0):])
+            finally:
+                view.release()
 
     h.update(str(size).encode("utf-8"))
-    return h.hexdigest()
+    # 16-byte digest as four signed ints, matching IntVectorProperty
+    return struct.unpack("<4i", h.digest())
+
+def file_stat_key(st):
+    # Blender Int/Float properties are 32-bit, too small for st_mtime_ns
+    return f"{st.st_mtime_ns}:{st.st_size}"
 
 # ------------------------------------------------------
 # UI HELPERS (SAFE)
 # ------------------------------------------------------
 
+# Written from any thread, applied on the main thread by status_pump
+_STATUS_STATE = {"text": None, "shown": None}
+STATUS_PUMP_INTERVAL = 0.1
+
 def set_status(text=None):
-    bpy.context.workspace.status_text_set(text)
+    _STATUS_STATE["text"] = text
 
 def clear_status():
-    bpy.context.workspace.status_text_set(None)
+    _STATUS_STATE["text"] = None
+
+def status_pump():
+    text = _STATUS_STATE["text"]
+
+    if text != _STATUS_STATE["shown"]:
+        _STATUS_STATE["shown"] = text
+        # status_text_set reads the window from context, which timers lack
+        for window in bpy.context.window_manager.windows:
+            with bpy.context.temp_override(window=window):
+                window.workspace.status_text_set(text)
+
+    return STATUS_PUMP_INTERVAL
 
 def report_info(msg):
     bpy.ops.wm.report(type={'INFO'}, message=msg)
@@ -96,12 +142,35 @@ class DiscordProjectSettings(bpy.types.PropertyGroup):
         max=3600
     )
 
+    upload_limit_mb: bpy.props.IntProperty(
+        name="Upload Limit (MB)",
+        description="Largest attachment the Discord server accepts",
+        default=25,
+        min=1,
+        max=500
+    )
+
+    compression_preset: bpy.props.EnumProperty(
+        name="Compression",
+        items=[
+            ('FAST', "Fast", "LZMA2 -mx=3, quickest uploads"),
+            ('BALANCED', "Balanced", "LZMA2 -mx=5, good size for the time"),
+            ('ARCHIVAL', "Archival", "LZMA2 -mx=9, smallest archive, slowest"),
+        ],
+        default='BALANCED'
+    )
+
     last_send_time: bpy.props.FloatProperty(
         default=0.0,
         options={'HIDDEN'}
     )
 
-    last_file_hash: bpy.props.StringProperty(
+    last_file_digest: bpy.props.IntVectorProperty(
+        size=4,
+        options={'HIDDEN'}
+    )
+
+    last_file_stat: bpy.props.StringProperty(
         default="",
         options={'HIDDEN'}
     )
@@ -126,83 +195,251 @@ def is_cooldown_active(settings):
 # SAVE TYPE
 # ------------------------------------------------------
 
+# filepath -> (basename, is_autosave), cleared when a file is loaded
+_BASENAME_CACHE = {}
+
+def file_name_info(filepath):
+    info = _BASENAME_CACHE.get(filepath)
+
+    if info is None:
+        name = os.path.basename(filepath)
+        lower = name.lower()
+        info = (name, "autosave" in lower or "quit" in lower)
+        _BASENAME_CACHE[filepath] = info
+
+    return info
+
 def is_autosave(filepath):
-    name = os.path.basename(filepath).lower()
-    return "autosave" in name or "quit" in name
+    return file_name_info(filepath)[1]
+
+@bpy.app.handlers.persistent
+def on_load_post(dummy):
+    _BASENAME_CACHE.clear()
 
 # ------------------------------------------------------
 # CORE
 # ------------------------------------------------------
 
-def compress_blend_7z(filepath):
+def compress_blend_7z(filepath, content_hash, preset="BALANCED"):
+    level = COMPRESSION_PRESETS[preset]
+    name = os.path.splitext(file_name_info(filepath)[0])[0]
+    tag = struct.pack("<4i", *content_hash).hex()[:16]
     out = os.path.join(
-        tempfile.gettempdir(),
-        os.path.basename(filepath).replace(".blend", ".7z")
+        ARCHIVE_CACHE_DIR,
+        f"{name}-{tag}-{preset.lower()}.7z"
     )
 
+    # Same content + preset already compressed (retry / repeated Send Now)
+    if os.path.exists(out) and os.path.getsize(out) > 0:
+        return out
+
+    os.makedirs(ARCHIVE_CACHE_DIR, exist_ok=True)
+
+    # Compress next to the target so an aborted run never looks cached
+    tmp = out + ".tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+
+    # Not piped with -so: 7z cannot write .7z to a non-seekable stream and
+    # Discord needs Content-Length up front, so the upload streams this file
     subprocess.run(
-        [SEVEN_ZIP_PATH, "a", "-t7z", "-mx=9", "-m0=lzma2", out, filepath],
+        [SEVEN_ZIP_PATH, "a", "-t7z", f"-mx={level}", "-m0=lzma2", "-mmt=on", tmp, filepath],
         stdout=subprocess.DEVNULL,
         stderr=subprocess.DEVNULL,
         check=True
     )
 
+    os.replace(tmp, out)
+    prune_archive_cache(keep=out)
     return out
 
+def prune_archive_cache(max_age=ARCHIVE_CACHE_MAX_AGE, max_bytes=ARCHIVE_CACHE_MAX_BYTES, keep=None):
+    if not os.path.isdir(ARCHIVE_CACHE_DIR):
+        return
+
+    entries = []
+    for entry in os.scandir(ARCHIVE_CACHE_DIR):
+        try:
+            if entry.is_file():
+                entries.append((entry.path, entry.stat()))
+        except OSError:
+            pass
+
+    # Newest first, so the size cap evicts the least recently written
+    entries.sort(key=lambda e: e[1].st_mtime, reverse=True)
+
+    cutoff = time.time() - max_age
+    total = 0
+    for path, st in entries:
+        if path == keep:
+            total += st.st_size
+            continue
+
+        # A .tmp may belong to a running 7z, only drop it once it is stale
+        stale = st.st_mtime < cutoff
+        over_cap = path.endswith(".7z") and total + st.st_size > max_bytes
+
+        if stale or over_cap:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        elif path.endswith(".7z"):
+            total += st.st_size
+
+def remove_superseded_archives(filepath, keep):
+    # Older content or other presets of the same .blend are never sent again
+    name = os.path.splitext(file_name_info(filepath)[0])[0]
+    pattern = re.compile(re.escape(name) + r"-[0-9a-f]{16}-[a-z]+\.7z")
+
+    if not os.path.isdir(ARCHIVE_CACHE_DIR):
+        return
+
+    for entry in os.scandir(ARCHIVE_CACHE_DIR):
+        if entry.path != keep and pattern.fullmatch(entry.name):
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
 def build_commit_message(settings):
     if settings.commit_message.strip():
         return settings.commit_message.strip()
     return "Update: File saved"
 
-def send_to_discord(webhook, archive, message):
-    with open(archive, "rb") as f:
-        file_data = f.read()
-
-    boundary = "----BlenderDiscordBoundary"
-    payload = json.dumps({"content": message}).encode("utf-8")
-
-    body = (
-        f"--{boundary}\r\n"
-        f"Content-Disposition: form-data; name=\"payload_json\"\r\n"
-        f"Content-Type: application/json\r\n\r\n"
-    ).encode() + payload + (
-        f"\r\n--{boundary}\r\n"
-        f"Content-Disposition: form-data; name=\"file\"; filename=\"{os.path.basename(archive)}\"\r\n"
-        f"Content-Type: application/x-7z-compressed\r\n\r\n"
-    ).encode() + file_data + (
-        f"\r\n--{boundary}--\r\n"
-    ).encode()
-
-    req = urllib.request.Request(
-        webhook,
-        data=body,
-        headers={
-            "Content-Type": f"multipart/form-data; boundary={boundary}",
-            "Content-Length": str(len(body)),
-            "User-Agent": "BlenderDiscordUploader",
-        },
-        method="POST"
+# Static multipart fragments, built once
+_BOUNDARY = b"----BlenderDiscordBoundary"
+_MULTIPART_CONTENT_TYPE = "multipart/form-data; boundary=" + _BOUNDARY.decode()
+_PAYLOAD_HEAD = (
+    b"--" + _BOUNDARY + b"\r\n"
+    b"Content-Disposition: form-data; name=\"payload_json\"\r\n"
+    b"Content-Type: application/json\r\n\r\n"
+)
+_FILE_HEAD_FMT = (
+    b"\r\n--" + _BOUNDARY + b"\r\n"
+    b"Content-Disposition: form-data; name=\"file\"; filename=\"%b\"\r\n"
+    b"Content-Type: application/x-7z-compressed\r\n\r\n"
+)
+_EPILOGUE = b"\r\n--" + _BOUNDARY + b"--\r\n"
+
+_HTTPS_CONN = None
+_HTTPS_LOCK = threading.Lock()
+
+def get_https_connection(host, port=None):
+    global _HTTPS_CONN
+
+    port = port or http.client.HTTPS_PORT
+    if _HTTPS_CONN is None or (_HTTPS_CONN.host, _HTTPS_CONN.port) != (host, port):
+        close_https_connection()
+        _HTTPS_CONN = http.client.HTTPSConnection(host, port, timeout=30)
+
+    return _HTTPS_CONN
+
+def close_https_connection():
+    global _HTTPS_CONN
+
+    if _HTTPS_CONN is not None:
+        _HTTPS_CONN.close()
+        _HTTPS_CONN = None
+
+def send_to_discord(webhook, archive, message, filename=None):
+    payload = b'{"content":' + json.dumps(message).encode("utf-8") + b'}'
+    head = (
+        _PAYLOAD_HEAD
+        + payload
+        + _FILE_HEAD_FMT % (filename or os.path.basename(archive)).encode("utf-8")
     )
 
-    urllib.request.urlopen(req, timeout=30)
+    # Known before the file is opened, so the body can be streamed from disk
+    content_length = len(head) + os.path.getsize(archive) + len(_EPILOGUE)
+
+    url = urllib.parse.urlsplit(webhook)
+    path = f"{url.path}?{url.query}" if url.query else url.path
+    headers = {
+        "Content-Type": _MULTIPART_CONTENT_TYPE,
+        "Content-Length": str(content_length),
+        "User-Agent": "BlenderDiscordUploader",
+        "Connection": "keep-alive",
+    }
+
+    with _HTTPS_LOCK:
+        while True:
+            conn = get_https_connection(url.hostname, url.port)
+            reused = conn.sock is not None
+            try:
+                conn.putrequest("POST", path)
+                for key, value in headers.items():
+                    conn.putheader(key, value)
+                conn.endheaders()
+
+                conn.send(head)
+                with open(archive, "rb") as f:
+                    while chunk := f.read(UPLOAD_CHUNK):
+                        conn.send(chunk)
+                conn.send(_EPILOGUE)
+
+                response = conn.getresponse()
+                response.read()
+                break
+            except (http.client.BadStatusLine, ConnectionError):
+                conn.close()
+                # Discord dropped the idle keep-alive socket, retry on a fresh one
+                if not reused:
+                    raise
+            except Exception:
+                # Timeouts, TLS or file errors leave the request half sent
+                close_https_connection()
+                raise
+
+    if response.status >= 400:
+        raise RuntimeError(f"Discord upload failed: HTTP {response.status} {response.reason}")
 
 # ------------------------------------------------------
 # BACKGROUND SEND
 # ------------------------------------------------------
 
-def process_send(filepath, settings, autosave, current_hash):
+def process_send(filepath, settings, autosave, current_hash, stat_key):
     try:
+        # Queued while an earlier job was uploading, re-check against its result
+        if current_hash == tuple(settings.last_file_digest):
+            return
+
+        cooldown, remaining = is_cooldown_active(settings)
+        if cooldown:
+            return
+
         set_status("📦 Compressing project...")
-        archive = compress_blend_7z(filepath)
+        preset = settings.compression_preset
+        archive = compress_blend_7z(filepath, current_hash, preset)
+
+        # Check the size before uploading, Discord would reject it anyway
+        limit = settings.upload_limit_mb * 1024 * 1024
+        size = os.path.getsize(archive)
+
+        # Archival only shaves a few percent off LZMA2, so only try it when close
+        if limit < size <= limit * RECOMPRESS_MARGIN and preset != "ARCHIVAL":
+            set_status("📦 Archive too large — recompressing (Archival)...")
+            archive = compress_blend_7z(filepath, current_hash, "ARCHIVAL")
+            size = os.path.getsize(archive)
+
+        if size > limit:
+            raise RuntimeError(
+                f"Archive is {size / (1024 * 1024):.1f} MB, over the "
+                f"{settings.upload_limit_mb} MB Discord upload limit — not sent"
+            )
 
         set_status("📡 Uploading to Discord...")
         send_to_discord(
             settings.webhook_url,
             archive,
-            build_commit_message(settings)
+            build_commit_message(settings),
+            os.path.splitext(file_name_info(filepath)[0])[0] + ".7z"
         )
 
-        settings.last_file_hash = current_hash
+        remove_superseded_archives(filepath, archive)
+
+        settings.last_file_digest = current_hash
+        settings.last_file_stat = stat_key
         settings.last_send_time = time.time()
         settings.commit_message = ""
 
@@ -214,17 +451,76 @@ def process_send(filepath, settings, autosave, current_hash):
     finally:
         clear_status()
 
+# One worker thread; a newer send replaces any job still waiting
+_SEND_LOCK = threading.Lock()
+_PENDING_SEND = None
+_SEND_WORKER = None
+
+def queue_send(filepath, settings, autosave, current_hash, stat_key):
+    global _PENDING_SEND, _SEND_WORKER
+
+    with _SEND_LOCK:
+        _PENDING_SEND = (filepath, settings, autosave, current_hash, stat_key)
+
+        if _SEND_WORKER is None:
+            _SEND_WORKER = threading.Thread(target=send_worker, daemon=True)
+            _SEND_WORKER.start()
+
+def send_worker():
+    global _PENDING_SEND, _SEND_WORKER
+
+    while True:
+        with _SEND_LOCK:
+            job = _PENDING_SEND
+            _PENDING_SEND = None
+
+            if job is None:
+                _SEND_WORKER = None
+                return
+
+        process_send(*job)
+
 # ------------------------------------------------------
 # SAVE HANDLER (ABSOLUTE GATE)
 # ------------------------------------------------------
 
+SAVE_DEBOUNCE_SECONDS = 2.0
+_PENDING_TIMER = None
+
+def cancel_pending_send():
+    global _PENDING_TIMER
+
+    if _PENDING_TIMER is not None and bpy.app.timers.is_registered(_PENDING_TIMER):
+        bpy.app.timers.unregister(_PENDING_TIMER)
+    _PENDING_TIMER = None
+
 def on_save_post(dummy):
+    global _PENDING_TIMER
+
     settings = bpy.context.scene.discord_project_settings
     filepath = bpy.data.filepath
 
     if not settings.auto_send or not filepath or not settings.webhook_url:
         return
 
+    # Bursts of saves (manual + autosave) collapse into one send
+    cancel_pending_send()
+    _PENDING_TIMER = functools.partial(dispatch_send, filepath)
+    bpy.app.timers.register(_PENDING_TIMER, first_interval=SAVE_DEBOUNCE_SECONDS)
+
+def dispatch_send(filepath):
+    global _PENDING_TIMER
+    _PENDING_TIMER = None
+
+    settings = bpy.context.scene.discord_project_settings
+
+    # Another file was opened or the settings changed while the timer was pending
+    if filepath != bpy.data.filepath:
+        return
+
+    if not settings.auto_send or not settings.webhook_url:
+        return
+
     autosave = is_autosave(filepath)
 
     cooldown, remaining = is_cooldown_active(settings)
@@ -233,18 +529,24 @@ def on_save_post(dummy):
             show_cooldown_status(remaining)
         return
 
-    current_hash = compute_partial_hash(filepath)
+    st = os.stat(filepath)
+    stat_key = file_stat_key(st)
 
-    if current_hash == settings.last_file_hash:
+    if stat_key == settings.last_file_stat:
         if not autosave:
             show_no_change_status()
         return
 
-    threading.Thread(
-        target=process_send,
-        args=(filepath, settings, autosave, current_hash),
-        daemon=True
-    ).start()
+    current_hash = compute_partial_hash(filepath, st.st_size)
+
+    if current_hash == tuple(settings.last_file_digest):
+        # Same bytes as the last send, let the next check stop at os.stat
+        settings.last_file_stat = stat_key
+        if not autosave:
+            show_no_change_status()
+        return
+
+    queue_send(filepath, settings, autosave, current_hash, stat_key)
 
 # ------------------------------------------------------
 # SEND NOW
@@ -258,22 +560,29 @@ class DISCORDSEND_OT_SendNow(bpy.types.Operator):
         settings = context.scene.discord_project_settings
         filepath = bpy.data.filepath
 
+        # A manual send supersedes any debounced save still waiting
+        cancel_pending_send()
+
         cooldown, remaining = is_cooldown_active(settings)
         if cooldown:
             show_cooldown_status(remaining)
             return {'FINISHED'}
 
-        current_hash = compute_partial_hash(filepath)
+        st = os.stat(filepath)
+        stat_key = file_stat_key(st)
 
-        if current_hash == settings.last_file_hash:
+        if stat_key == settings.last_file_stat:
             show_no_change_status()
             return {'FINISHED'}
 
-        threading.Thread(
-            target=process_send,
-            args=(filepath, settings, False, current_hash),
-            daemon=True
-        ).start()
+        current_hash = compute_partial_hash(filepath, st.st_size)
+
+        if current_hash == tuple(settings.last_file_digest):
+            settings.last_file_stat = stat_key
+            show_no_change_status()
+            return {'FINISHED'}
+
+        queue_send(filepath, settings, False, current_hash, stat_key)
 
         return {'FINISHED'}
 
@@ -295,6 +604,8 @@ class DISCORDSEND_PT_Panel(bpy.types.Panel):
         layout.prop(s, "auto_send")
         layout.prop(s, "commit_message")
         layout.prop(s, "cooldown_seconds")
+        layout.prop(s, "compression_preset")
+        layout.prop(s, "upload_limit_mb")
         layout.operator("discord.send_now", icon="EXPORT")
 
 # ------------------------------------------------------
@@ -308,6 +619,8 @@ classes = (
 )
 
 def register():
+    prune_archive_cache()
+
     for c in classes:
         bpy.utils.register_class(c)
 
@@ -316,9 +629,16 @@ def register():
     )
 
     bpy.app.handlers.save_post.append(on_save_post)
+    bpy.app.handlers.load_post.append(on_load_post)
+    bpy.app.timers.register(status_pump, persistent=True)
 
 def unregister():
     bpy.app.handlers.save_post.remove(on_save_post)
+    bpy.app.handlers.load_post.remove(on_load_post)
+    if bpy.app.timers.is_registered(status_pump):
+        bpy.app.timers.unregister(status_pump)
+    cancel_pending_send()
+    close_https_connection()
     del bpy.types.Scene.discord_project_settings
 
     for c in reversed(classes):